@@ -4,6 +4,19 @@ import sys
 import json
 import platform
 import time
+import atexit
+import hashlib
+import threading
+import urllib.request
+import urllib.error
+import re
+import glob
+import shutil
+import itertools
+import gzip
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style, init
 
 # Init colorama
@@ -13,22 +26,133 @@ init(autoreset=True)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 FASTFLAGS_FILE = os.path.join(SCRIPT_DIR, "fastFlags.json")
 LAUNCHER_STATE_FILE = os.path.join(SCRIPT_DIR, "launcher_state.json")
+LAUNCHER_STATE_LOCK_FILE = LAUNCHER_STATE_FILE + ".lock"
+FLEET_CONFIG_FILE = os.path.join(SCRIPT_DIR, "fleet_sync.json")
+FLEET_CACHE_FILE = os.path.join(SCRIPT_DIR, "fleet_cache.json")
+PERF_HISTORY_FILE = os.path.join(SCRIPT_DIR, "perf_history.jsonl")
+INTEGRITY_MANIFEST_FILE = os.path.join(SCRIPT_DIR, "integrity_manifest.json")
+
+# Fleet sync never holds up a launch for longer than this (seconds)
+FLEET_SYNC_TIMEOUT = 3
+FLEET_MAX_BUNDLE_SIZE = 4 * 1024 * 1024
+
+# Client log harvesting. Milestones are recorded the first time a line matches
+LOG_MILESTONES = [
+    ("settings_loaded", re.compile(r"ClientAppSettings|FastFlags? loaded|Settings loaded", re.IGNORECASE)),
+    ("game_join", re.compile(r"Joining game|joinScript|! Joining", re.IGNORECASE)),
+    ("connected", re.compile(r"Connection accepted|Replicator created|Connected to server", re.IGNORECASE)),
+    ("game_loaded", re.compile(r"Game loaded|DataModel loaded|Loaded game", re.IGNORECASE)),
+]
+LOG_TIMESTAMP_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})(?:\.(\d+))?")
+LOG_FPS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*fps\b|\bfps\s*[:=]\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+LOG_FRAME_MS_RE = re.compile(r"frame\s*time\s*[:=]?\s*(\d+(?:\.\d+)?)\s*ms", re.IGNORECASE)
+# Logs still being written to are left for the next harvest
+LOG_SETTLE_SECONDS = 60
+
+# Folders inside a version folder that change on every run and are left out of the manifest
+INTEGRITY_IGNORED_DIRS = {"ClientSettings", "logs"}
+INTEGRITY_HASH_WORKERS = min(8, os.cpu_count() or 1)
 
 version_prefix = "ECSRClient280825"
 
+# launcher_state.json layout: {"schema": 1, "namespaces": {"<namespace>": {...}}}
+# Files without a schema (the old flat dict) are read as the "launcher" namespace
+STATE_SCHEMA_VERSION = 1
+
 # fixed press any key (i think??)
 if os.name == "nt":
     import msvcrt
+    fcntl = None
     def press_any_key(prompt="Press any key to continue..."):
         print(Fore.MAGENTA + prompt, end="", flush=True)
         msvcrt.getch()
         print()
 else:
+    import fcntl
     def press_any_key(prompt="Press any key to continue..."):
         input(Fore.MAGENTA + prompt)
 
+# Gradient logo, rendered once instead of on every menu redraw
+LOGO_GRADIENT = [
+    (7, 200, 249),
+    (5, 157, 230),
+    (4, 123, 220),
+    (3, 98, 210),
+    (2, 74, 200),
+    (1, 58, 195),
+    (0, 50, 185),
+    (13, 65, 225),
+]
+LOGO_LINES = [
+    "  ______ _____  _____  _____     _____ _                   ",
+    " |  ____/ ____|/ ____||  __ \   / ____| |                  ",
+    " | |__ | |    | (___(_) |__) | | (___ | |_ _ __ __ _ _ __  ",
+    " |  __|| |     \___ \ |  _  /   \___ \| __| '__/ _` | '_ \ ",
+    " | |___| |____ ____) || | \ \   ____) | |_| | | (_| | |_) |",
+    " |______\_____|_____(_)_|  \_\ |_____/ \__|_|  \__,_| .__/ ",
+    "                                                    | |    ",
+    "                                                    |_|    "
+]
+LOGO_BLOCK = [f"\033[38;2;{r};{g};{b}m{line}\033[0m" for (r, g, b), line in zip(LOGO_GRADIENT, LOGO_LINES)]
+
+ANSI_ESCAPE_RE = re.compile(r"\033\[[0-9;]*[A-Za-z]")
+# Rows kept free under a menu: the prompt (2), a one-line reply, "press any key"
+# and the row the cursor ends on. Actions that print more clear() afterwards.
+SCREEN_MARGIN = 5
+
+# Last frame drawn by render_screen(), so the next one only repaints changed lines
+_screen = {"lines": None, "size": None}
+
 def clear():
-    os.system("cls" if os.name == "nt" else "clear")
+    """Clears the terminal with ANSI sequences instead of spawning a shell"""
+    _screen["lines"] = None
+    if sys.stdout.isatty():
+        sys.stdout.write("\033[H\033[2J")
+        sys.stdout.flush()
+
+def fit_line(text):
+    """Cuts plain text to the terminal width so each menu line stays on one row"""
+    if not sys.stdout.isatty():
+        return text
+    width = shutil.get_terminal_size().columns - 1
+    return text if len(text) <= width else text[:max(width - 3, 0)] + "..."
+
+def render_screen(lines):
+    """
+    Draws a menu, repainting only the lines that changed since the last frame.
+    Falls back to a full redraw when the terminal was resized or the frame
+    would not fit, and to plain printing when stdout is not a terminal.
+    """
+    if not sys.stdout.isatty():
+        print("\n".join(lines))
+        return
+
+    size = shutil.get_terminal_size()
+    fits = len(lines) + SCREEN_MARGIN <= size.lines and all(
+        len(ANSI_ESCAPE_RE.sub("", line)) < size.columns for line in lines
+    )
+    previous = _screen["lines"] if fits and _screen["size"] == size else None
+
+    if previous is None:
+        output = ["\033[H\033[2J", "\n".join(lines), "\n"]
+    else:
+        output = []
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                output.append(f"\033[{row + 1};1H{line}\033[0m\033[K")
+        # Drop whatever the last prompt and messages left below the menu
+        output.append(f"\033[{len(lines) + 1};1H\033[J")
+    sys.stdout.write("".join(output))
+    sys.stdout.flush()
+
+    _screen["lines"] = list(lines) if fits else None
+    _screen["size"] = size
+
+def flag_page_size(chrome_lines):
+    """How many FastFlags fit on screen next to chrome_lines of menu"""
+    if not sys.stdout.isatty():
+        return 50
+    return max(shutil.get_terminal_size().lines - chrome_lines - SCREEN_MARGIN, 5)
 
 def get_system_info():
     """Get system information for cross-platform compatibility"""
@@ -80,13 +204,16 @@ def get_executable_paths(folder):
     
     return exe_paths
 
-def load_fastflags():
-    print(Fore.CYAN + f"[*] Attempting to read FastFlags from '{FASTFLAGS_FILE}'...")
+def load_fastflags(quiet=False):
+    if not quiet:
+        print(Fore.CYAN + f"[*] Attempting to read FastFlags from '{FASTFLAGS_FILE}'...")
     if not os.path.exists(FASTFLAGS_FILE):
-        print(Fore.YELLOW + "[*] File does not exist. Creating a new one...")
+        if not quiet:
+            print(Fore.YELLOW + "[*] File does not exist. Creating a new one...")
         with open(FASTFLAGS_FILE, "w") as f:
             json.dump({}, f, indent=2)
-        print(Fore.GREEN + "[*] Created new empty file.")
+        if not quiet:
+            print(Fore.GREEN + "[*] Created new empty file.")
         return {}
     try:
         with open(FASTFLAGS_FILE, "r") as f:
@@ -97,8 +224,9 @@ def load_fastflags():
             data = json.loads(sanitized_content)
             
             if isinstance(data, dict):
-                print(Fore.GREEN + f"[*] Successfully read {len(data)} FastFlag(s).")
-                print(Fore.MAGENTA + f"[*] Read data: {json.dumps(data, indent=2)}")
+                if not quiet:
+                    print(Fore.GREEN + f"[*] Successfully read {len(data)} FastFlag(s).")
+                    print(Fore.MAGENTA + f"[*] Read data: {json.dumps(data, indent=2)}")
                 return data
             else:
                 print(Fore.RED + f"[!] The file '{FASTFLAGS_FILE}' contains invalid data. Expected a JSON object.")
@@ -170,35 +298,52 @@ def auto_detect_value_type(value_str):
     return value_str
 
 def ask_fastflags():
+    page = 0
     while True:
-        clear()
-        print(Fore.YELLOW + "FastFlags Configuration")
-        fastflags = load_fastflags()
+        fastflags = load_fastflags(quiet=True)
+        lines = [Fore.YELLOW + "FastFlags Configuration"]
         
         if fastflags:
-            print(Fore.CYAN + "Current FFlags:")
-            for i, (k, v) in enumerate(fastflags.items(), 1):
+            # Only the rows on the visible page get formatted
+            page_size = flag_page_size(12)
+            page_count = (len(fastflags) + page_size - 1) // page_size
+            page = min(page, page_count - 1)
+            start = page * page_size
+            lines.append(Fore.CYAN + f"Current FFlags ({len(fastflags)}):")
+            for i, (k, v) in enumerate(itertools.islice(fastflags.items(), start, start + page_size), start + 1):
                 value_type = type(v).__name__
-                print(Fore.YELLOW + f" {i}. {k} = {v} ({value_type})")
+                lines.append(Fore.YELLOW + fit_line(f" {i}. {k} = {v} ({value_type})"))
+            if page_count > 1:
+                lines.append(Fore.CYAN + f" Page {page + 1}/{page_count} - n: next page, p: previous page")
         else:
-            print(Fore.MAGENTA + "No fflags set yet")
+            lines.append(Fore.MAGENTA + "No fflags set yet")
         
-        print(Fore.GREEN + "\nOptions:")
-        print("1. Add FastFlag")
-        print("2. Remove FastFlag") 
-        print("3. Clear all FastFlags")
-        print("4. Apply FastFlags")
-        print("5. Import FastFlags from JSON")
-        print("0. Back to main menu")
+        lines.append("")
+        lines.append(Fore.GREEN + "Options:")
+        lines.append("1. Add FastFlag")
+        lines.append("2. Remove FastFlag")
+        lines.append("3. Clear all FastFlags")
+        lines.append("4. Apply FastFlags")
+        lines.append("5. Import FastFlags from JSON")
+        lines.append("6. Sync FastFlags from fleet endpoint")
+        lines.append("0. Back to main menu")
+        render_screen(lines)
         
         choice = input(Fore.WHITE + "\nEnter choice: ").strip()
         
-        if choice == "1":
+        if choice.lower() == "n":
+            page += 1
+        elif choice.lower() == "p":
+            page = max(page - 1, 0)
+        elif choice == "1":
             add_fastflag(fastflags)
+            clear()
         elif choice == "2":
             remove_fastflag(fastflags)
+            clear()
         elif choice == "3":
             clear_fastflags()
+            clear()
         elif choice == "4":
             if fastflags:
                 if apply_fastflags(fastflags):
@@ -208,8 +353,13 @@ def ask_fastflags():
             else:
                 print(Fore.YELLOW + "[*] No FastFlags to apply")
             press_any_key()
+            clear()
         elif choice == "5":
             import_fastflags()
+            clear()
+        elif choice == "6":
+            sync_fastflags_menu()
+            clear()
         elif choice == "0":
             break
         else:
@@ -317,6 +467,644 @@ def import_fastflags():
     
     press_any_key()
 
+def flags_checksum(fastflags):
+    """SHA-256 of a flag set in canonical JSON form"""
+    canonical = json.dumps(fastflags, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def make_flag_bundle(fastflags):
+    """Build a fleet bundle that can be served to fleet_sync clients"""
+    return {"sha256": flags_checksum(fastflags), "flags": fastflags}
+
+def print_flag_bundle(path):
+    """Prints the fleet bundle for a FastFlags JSON file, for --make-bundle"""
+    try:
+        with open(path, "r") as f:
+            fastflags = json.loads(f.read().replace('\u00A0', ' '))
+    except (OSError, json.JSONDecodeError) as e:
+        print(Fore.RED + f"[!] Error reading '{path}': {e}")
+        sys.exit(1)
+    if not isinstance(fastflags, dict):
+        print(Fore.RED + f"[!] The file '{path}' contains invalid data. Expected a JSON object.")
+        sys.exit(1)
+    print(json.dumps(make_flag_bundle(fastflags), indent=2))
+
+def load_fleet_config():
+    """Read fleet_sync.json, ECSR_FLEET_URL overrides the configured url"""
+    config = {"url": None, "timeout": FLEET_SYNC_TIMEOUT}
+    if os.path.exists(FLEET_CONFIG_FILE):
+        try:
+            with open(FLEET_CONFIG_FILE, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                config.update(data)
+            else:
+                print(Fore.RED + f"[!] '{FLEET_CONFIG_FILE}' must contain a JSON object.")
+        except (OSError, json.JSONDecodeError) as e:
+            print(Fore.RED + f"[!] Error reading '{FLEET_CONFIG_FILE}': {e}")
+    env_url = os.getenv("ECSR_FLEET_URL")
+    if env_url:
+        config["url"] = env_url
+    return config
+
+def save_fleet_config(config):
+    try:
+        with open(FLEET_CONFIG_FILE, "w") as f:
+            json.dump(config, f, indent=2)
+    except Exception as e:
+        print(Fore.RED + f"[!] Failed to save fleet sync config: {e}")
+
+def load_fleet_cache():
+    if not os.path.exists(FLEET_CACHE_FILE):
+        return {}
+    try:
+        with open(FLEET_CACHE_FILE, "r") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        print(Fore.RED + "[!] Error reading fleet_cache.json - ignoring cached bundle.")
+        return {}
+
+def save_fleet_cache(cache):
+    # Write to a temp file first so an interrupted sync never leaves a half-written cache
+    tmp_path = FLEET_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, FLEET_CACHE_FILE)
+    except Exception as e:
+        print(Fore.RED + f"[!] Failed to save fleet cache: {e}")
+
+def verify_flag_bundle(bundle):
+    """Return the flags of a bundle, raising ValueError if the checksum does not match"""
+    if not isinstance(bundle, dict) or not isinstance(bundle.get("flags"), dict):
+        raise ValueError("bundle must be a JSON object with a 'flags' object")
+    expected = str(bundle.get("sha256", "")).lower()
+    if not expected:
+        raise ValueError("bundle has no 'sha256' checksum")
+    actual = flags_checksum(bundle["flags"])
+    if actual != expected:
+        raise ValueError(f"checksum mismatch (expected {expected}, got {actual})")
+    return bundle["flags"]
+
+def fetch_flag_bundle(url, cache, timeout):
+    """
+    Conditionally fetch the bundle at url.
+    Returns a new cache entry, or None when the server answered 304 Not Modified.
+    """
+    request = urllib.request.Request(url, headers={"Accept": "application/json", "User-Agent": "EcsrStrap"})
+    if cache.get("url") == url:
+        if cache.get("etag"):
+            request.add_header("If-None-Match", cache["etag"])
+        if cache.get("last_modified"):
+            request.add_header("If-Modified-Since", cache["last_modified"])
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read(FLEET_MAX_BUNDLE_SIZE + 1)
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+    if len(body) > FLEET_MAX_BUNDLE_SIZE:
+        raise ValueError(f"bundle is larger than {FLEET_MAX_BUNDLE_SIZE} bytes")
+    bundle = json.loads(body.decode("utf-8").replace('\u00A0', ' '))
+    flags = verify_flag_bundle(bundle)
+    return {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "sha256": flags_checksum(flags),
+        "flags": flags,
+        "fetched_at": time.time(),
+    }
+
+def sync_fastflags(config=None):
+    """
+    Pulls the fleet bundle and merges it into fastFlags.json.
+    Falls back to the cached bundle when the endpoint is slow or unreachable,
+    so this never takes longer than the configured timeout.
+    A bundle is merged once; local edits stay until the fleet publishes a new
+    one, and flags dropped from the bundle are removed again.
+    Returns True if a fleet bundle is available.
+    """
+    config = config or load_fleet_config()
+    url = config.get("url")
+    if not url:
+        print(Fore.YELLOW + "[*] No fleet sync endpoint configured.")
+        return False
+    try:
+        timeout = float(config.get("timeout"))
+        if timeout <= 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        print(Fore.YELLOW + f"[!] Invalid fleet sync timeout {config.get('timeout')!r}, using {FLEET_SYNC_TIMEOUT}s.")
+        timeout = FLEET_SYNC_TIMEOUT
+
+    cache = load_fleet_cache()
+    result = {}
+
+    def worker():
+        try:
+            result["cache"] = fetch_flag_bundle(url, cache, timeout)
+        except Exception as e:
+            result["error"] = e
+
+    print(Fore.CYAN + f"[*] Syncing FastFlags from {url}...")
+    # urlopen's timeout does not cover DNS lookups, so bound the whole fetch with a thread
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    if thread.is_alive():
+        print(Fore.YELLOW + f"[!] Fleet endpoint did not answer within {timeout}s, using cached bundle.")
+    elif "error" in result:
+        print(Fore.RED + f"[!] Fleet sync failed: {result['error']}")
+        print(Fore.YELLOW + "[*] Using cached bundle.")
+    elif result["cache"] is None:
+        print(Fore.CYAN + "[*] Fleet bundle unchanged.")
+    else:
+        # Keep track of what the previous bundle put into fastFlags.json
+        for key in ("applied_sha256", "applied_keys"):
+            if key in cache:
+                result["cache"][key] = cache[key]
+        cache = result["cache"]
+        save_fleet_cache(cache)
+        print(Fore.GREEN + f"[*] Fetched fleet bundle with {len(cache['flags'])} FastFlag(s).")
+
+    if cache.get("url") != url or not isinstance(cache.get("flags"), dict):
+        print(Fore.YELLOW + "[*] No cached fleet bundle available.")
+        return False
+    if flags_checksum(cache["flags"]) != cache.get("sha256"):
+        print(Fore.RED + "[!] Cached fleet bundle failed its checksum - ignoring it.")
+        return False
+
+    if cache.get("applied_sha256") == cache["sha256"]:
+        print(Fore.CYAN + "[*] Fleet bundle already merged.")
+        return True
+
+    current_flags = load_fastflags()
+    merged_flags = dict(current_flags)
+    removed_keys = [key for key in cache.get("applied_keys", []) if key not in cache["flags"]]
+    for key in removed_keys:
+        merged_flags.pop(key, None)
+    merged_flags.update(cache["flags"])
+    if merged_flags == current_flags:
+        print(Fore.CYAN + "[*] FastFlags already match the fleet bundle.")
+    else:
+        save_fastflags(merged_flags)
+        print(Fore.GREEN + f"[*] Merged {len(cache['flags'])} fleet FastFlag(s), removed {len(removed_keys)}.")
+
+    cache["applied_sha256"] = cache["sha256"]
+    cache["applied_keys"] = sorted(cache["flags"])
+    save_fleet_cache(cache)
+    return True
+
+def sync_fastflags_menu():
+    config = load_fleet_config()
+    print(Fore.CYAN + "\nSync FastFlags from fleet endpoint:")
+    print(Fore.YELLOW + f"Current endpoint: {config.get('url') or 'not set'}")
+    url = input(Fore.WHITE + "New endpoint URL (leave empty to keep): ").strip()
+    if url:
+        config["url"] = url
+        save_fleet_config({k: v for k, v in config.items() if v is not None})
+
+    sync_fastflags(config)
+    press_any_key()
+
+def get_log_dirs():
+    """Client log folders, next to Versions/ in each ECSR AppData tree"""
+    log_dirs = []
+    for base_path in get_installation_paths():
+        ecsr_dir = os.path.dirname(os.path.dirname(base_path))
+        for log_dir in glob.glob(os.path.join(ecsr_dir, "logs")):
+            if os.path.isdir(log_dir) and log_dir not in log_dirs:
+                log_dirs.append(log_dir)
+    return log_dirs
+
+def get_log_sessions():
+    """
+    Groups log files by name, so log.txt, log.txt.1 and log.txt.2.gz end up together.
+    Which of them belong to one run is decided by harvest_client_logs().
+    Returns {session_key: [(path, mtime), ...] oldest first}
+    """
+    sessions = {}
+    for log_dir in get_log_dirs():
+        for name in os.listdir(log_dir):
+            path = os.path.join(log_dir, name)
+            if not os.path.isfile(path) or not re.search(r"\.(txt|log)(\.\d+)?(\.gz)?$", name):
+                continue
+            key = re.sub(r"(\.\d+)?(\.gz)?$", "", path)
+            sessions.setdefault(key, []).append((path, os.path.getmtime(path)))
+    for files in sessions.values():
+        files.sort(key=lambda item: item[1])
+    return sessions
+
+def open_client_log(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+def parse_log_timestamp(line):
+    """Returns (timestamp or None, the rest of the line after the timestamp)"""
+    match = LOG_TIMESTAMP_RE.match(line)
+    if not match:
+        return None, line
+    date, clock, fraction = match.groups()
+    try:
+        stamp = datetime.strptime(f"{date} {clock}", "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None, line
+    return stamp + (float("0." + fraction) if fraction else 0.0), line[match.end():]
+
+def new_series():
+    return {"count": 0, "total": 0.0, "min": None, "max": None}
+
+def add_to_series(series, value):
+    series["count"] += 1
+    series["total"] += value
+    series["min"] = value if series["min"] is None else min(series["min"], value)
+    series["max"] = value if series["max"] is None else max(series["max"], value)
+
+def merge_series(series, other):
+    if not other["count"]:
+        return
+    series["count"] += other["count"]
+    series["total"] += other["total"]
+    series["min"] = other["min"] if series["min"] is None else min(series["min"], other["min"])
+    series["max"] = other["max"] if series["max"] is None else max(series["max"], other["max"])
+
+def parse_client_log(paths):
+    """
+    Streams through one session's log files line by line, so memory stays
+    bounded no matter how large the logs are.
+    Milestones are seconds since the first timestamped line.
+    """
+    result = {"lines": 0, "milestones": {}, "fps": new_series(), "frame_ms": new_series()}
+    first_stamp = None
+    pending_milestones = list(LOG_MILESTONES)
+
+    for path in paths:
+        try:
+            with open_client_log(path) as f:
+                for line in f:
+                    result["lines"] += 1
+                    # Match figures against the message only, the timestamp's seconds look like "02.000 fps"
+                    stamp, message = parse_log_timestamp(line)
+                    if stamp is not None and first_stamp is None:
+                        first_stamp = stamp
+
+                    if pending_milestones and stamp is not None:
+                        for milestone in pending_milestones:
+                            name, pattern = milestone
+                            if pattern.search(message):
+                                result["milestones"][name] = round(stamp - first_stamp, 3)
+                                pending_milestones.remove(milestone)
+                                break
+
+                    fps_match = LOG_FPS_RE.search(message)
+                    if fps_match:
+                        add_to_series(result["fps"], float(fps_match.group(1) or fps_match.group(2)))
+                    frame_match = LOG_FRAME_MS_RE.search(message)
+                    if frame_match:
+                        add_to_series(result["frame_ms"], float(frame_match.group(1)))
+        except (OSError, EOFError) as e:
+            print(Fore.RED + f"[!] Error reading log '{path}': {e}")
+    return result
+
+def write_perf_record(record, replace=False):
+    """
+    Appends record to perf_history.jsonl. With replace, the existing record
+    for the same log and launch is rewritten instead, streaming through the file.
+    """
+    if not replace or not os.path.exists(PERF_HISTORY_FILE):
+        with open(PERF_HISTORY_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        return
+
+    tmp_path = PERF_HISTORY_FILE + ".tmp"
+    replaced = False
+    with open(PERF_HISTORY_FILE, "r") as source, open(tmp_path, "w") as target:
+        for line in source:
+            try:
+                existing = json.loads(line)
+            except json.JSONDecodeError:
+                existing = None
+            if (not replaced and isinstance(existing, dict) and existing.get("log") == record["log"]
+                    and existing.get("launched_at") == record["launched_at"]):
+                line = json.dumps(record) + "\n"
+                replaced = True
+            target.write(line)
+        if not replaced:
+            target.write(json.dumps(record) + "\n")
+    os.replace(tmp_path, PERF_HISTORY_FILE)
+
+def harvest_client_logs(settle_seconds=0):
+    """
+    Parses client logs written since the last recorded launch and appends one
+    record per session to perf_history.jsonl, tagged with the launch's flag set.
+    A session that grows before the next launch keeps the launch it was first
+    harvested for, and its record is rewritten rather than added again.
+    Anything written after the current launch started belongs to that launch,
+    since record_launch() kills the client and harvests before recording it.
+    Returns the number of sessions harvested.
+    """
+    launch = state_get("perf", "pending_launch")
+    if not launch:
+        return 0
+
+    harvested_logs = dict(state_get("perf", "harvested_logs", {}))
+    sessions = get_log_sessions()
+    now = time.time()
+    harvested = 0
+
+    for key, files in sessions.items():
+        last_modified = files[-1][1]
+        if now - last_modified < settle_seconds:
+            continue
+        entry = harvested_logs.get(key)
+        if entry and entry["mtime"] >= last_modified:
+            continue
+
+        if last_modified >= launch["launched_at"]:
+            # Grown during the current launch, or a reused log file from a new one
+            same_session = bool(entry) and entry["launched_at"] == launch["launched_at"]
+            owner = entry if same_session else launch
+        elif entry:
+            same_session = True
+            owner = entry
+        else:
+            continue
+
+        # Rotated files left over from earlier launches are not part of this run
+        paths = [path for path, mtime in files if mtime >= owner["launched_at"]]
+        record = {
+            "flags_hash": owner["flags_hash"],
+            "flag_count": owner.get("flag_count", 0),
+            "launched_at": owner["launched_at"],
+            "log": key,
+        }
+        record.update(parse_client_log(paths))
+        try:
+            write_perf_record(record, replace=same_session)
+        except Exception as e:
+            print(Fore.RED + f"[!] Failed to save performance history: {e}")
+            break
+        harvested_logs[key] = {
+            "mtime": last_modified,
+            "flags_hash": owner["flags_hash"],
+            "flag_count": owner.get("flag_count", 0),
+            "launched_at": owner["launched_at"],
+        }
+        harvested += 1
+
+    # Forget logs that have since been deleted
+    state_set("perf", "harvested_logs", {k: v for k, v in harvested_logs.items() if k in sessions})
+    flush_state()
+    if harvested:
+        print(Fore.GREEN + f"[*] Harvested {harvested} client log session(s).")
+    return harvested
+
+def record_launch(fastflags):
+    """Remembers which flag set the next client logs belong to"""
+    harvest_client_logs()
+    state_set("perf", "pending_launch", {
+        "flags_hash": flags_checksum(fastflags),
+        "flag_count": len(fastflags),
+        "launched_at": time.time(),
+    })
+    flush_state()
+
+def perf_report():
+    """Compares startup milestones and frame rates between flag sets"""
+    clear()
+    harvest_client_logs(LOG_SETTLE_SECONDS)
+    print(Fore.MAGENTA + "FastFlags performance report")
+
+    if not os.path.exists(PERF_HISTORY_FILE):
+        print(Fore.YELLOW + "[*] No harvested client logs yet. Launch the game a few times first.")
+        press_any_key()
+        return
+
+    profiles = {}
+    try:
+        with open(PERF_HISTORY_FILE, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(record, dict) or "flags_hash" not in record:
+                    continue
+                profile = profiles.setdefault(record["flags_hash"], {
+                    "flag_count": record.get("flag_count", 0),
+                    "runs": 0,
+                    "milestones": {},
+                    "fps": new_series(),
+                    "frame_ms": new_series(),
+                })
+                profile["runs"] += 1
+                for name, seconds in record.get("milestones", {}).items():
+                    add_to_series(profile["milestones"].setdefault(name, new_series()), seconds)
+                merge_series(profile["fps"], record.get("fps", new_series()))
+                merge_series(profile["frame_ms"], record.get("frame_ms", new_series()))
+    except OSError as e:
+        print(Fore.RED + f"[!] Error reading '{PERF_HISTORY_FILE}': {e}")
+        press_any_key()
+        return
+
+    current_hash = flags_checksum(load_fastflags())
+    for flags_hash, profile in sorted(profiles.items(), key=lambda item: -item[1]["runs"]):
+        label = " (current)" if flags_hash == current_hash else ""
+        print(Fore.CYAN + f"\nProfile {flags_hash[:12]}{label} - {profile['flag_count']} flag(s), {profile['runs']} run(s)")
+        for name, _ in LOG_MILESTONES:
+            series = profile["milestones"].get(name)
+            if series:
+                print(Fore.YELLOW + f"  {name:<16} avg {series['total'] / series['count']:.2f}s (min {series['min']:.2f}s, max {series['max']:.2f}s)")
+        fps = profile["fps"]
+        if fps["count"]:
+            print(Fore.YELLOW + f"  {'fps':<16} avg {fps['total'] / fps['count']:.1f} (min {fps['min']:.1f}, max {fps['max']:.1f})")
+        frame_ms = profile["frame_ms"]
+        if frame_ms["count"]:
+            print(Fore.YELLOW + f"  {'frame time':<16} avg {frame_ms['total'] / frame_ms['count']:.2f}ms (min {frame_ms['min']:.2f}ms, max {frame_ms['max']:.2f}ms)")
+
+    print(Fore.MAGENTA + "=" * 50)
+    press_any_key()
+
+def get_version_dirs():
+    """Every ECSRClient* version folder next to the known installation paths"""
+    version_dirs = []
+    for base_path in get_installation_paths():
+        for version_dir in glob.glob(os.path.join(os.path.dirname(base_path), "ECSRClient*")):
+            if os.path.isdir(version_dir) and version_dir not in version_dirs:
+                version_dirs.append(version_dir)
+    return version_dirs
+
+def scan_version_dir(version_dir):
+    """Returns {relative path: (size, mtime_ns)} using only stat calls"""
+    files = {}
+    pending = [version_dir]
+    while pending:
+        folder = pending.pop()
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if folder != version_dir or entry.name not in INTEGRITY_IGNORED_DIRS:
+                    pending.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                relative_path = os.path.relpath(entry.path, version_dir).replace(os.sep, "/")
+                files[relative_path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+def hash_file(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_files(version_dir, relative_paths):
+    """Hashes files in parallel, returning {relative path: hash or None if unreadable}"""
+    def worker(relative_path):
+        try:
+            return relative_path, hash_file(os.path.join(version_dir, relative_path))
+        except OSError:
+            return relative_path, None
+
+    with ThreadPoolExecutor(max_workers=INTEGRITY_HASH_WORKERS) as executor:
+        return dict(executor.map(worker, relative_paths))
+
+def load_integrity_manifests():
+    if not os.path.exists(INTEGRITY_MANIFEST_FILE):
+        return {}
+    try:
+        with open(INTEGRITY_MANIFEST_FILE, "r") as f:
+            manifests = json.load(f)
+        return manifests if isinstance(manifests, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        print(Fore.RED + "[!] Error reading integrity_manifest.json - it will be rebuilt.")
+        return {}
+
+def save_integrity_manifests(manifests):
+    tmp_path = INTEGRITY_MANIFEST_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(manifests, f)
+        os.replace(tmp_path, INTEGRITY_MANIFEST_FILE)
+    except Exception as e:
+        print(Fore.RED + f"[!] Failed to save integrity manifest: {e}")
+
+def integrity_manifest_key(version_dir):
+    """Same key for a version folder however its path was built (dirname vs glob, / vs \\)"""
+    return os.path.normcase(os.path.realpath(version_dir))
+
+def build_integrity_manifest(version_dir):
+    """Records size, mtime and hash of every file, trusting the install as it is now"""
+    print(Fore.CYAN + f"[*] Building integrity manifest for {os.path.basename(version_dir)}...")
+    files = scan_version_dir(version_dir)
+    hashes = hash_files(version_dir, list(files))
+    manifests = load_integrity_manifests()
+    manifests[integrity_manifest_key(version_dir)] = {
+        "created_at": time.time(),
+        "files": {
+            relative_path: {"size": size, "mtime_ns": mtime_ns, "hash": hashes[relative_path]}
+            for relative_path, (size, mtime_ns) in files.items()
+            if hashes[relative_path] is not None
+        },
+    }
+    save_integrity_manifests(manifests)
+    print(Fore.GREEN + f"[*] Recorded {len(manifests[integrity_manifest_key(version_dir)]['files'])} file(s).")
+
+def check_install_integrity(version_dir, full=False):
+    """
+    Compares a version folder against its manifest.
+    Only files whose size/mtime changed are rehashed, unless full is set.
+    Files added since the manifest was built are not reported.
+    Returns a list of (relative path, problem) tuples, or None when there was
+    no manifest yet and one was just built, so nothing was verified.
+    """
+    manifests = load_integrity_manifests()
+    manifest = manifests.get(integrity_manifest_key(version_dir))
+    if not manifest:
+        build_integrity_manifest(version_dir)
+        return None
+
+    current = scan_version_dir(version_dir)
+    problems = []
+    to_hash = []
+    for relative_path, recorded in manifest["files"].items():
+        if relative_path not in current:
+            problems.append((relative_path, "missing"))
+        elif current[relative_path][0] != recorded["size"]:
+            problems.append((relative_path, "size changed"))
+        elif full or current[relative_path][1] != recorded["mtime_ns"]:
+            to_hash.append(relative_path)
+
+    if to_hash:
+        hashes = hash_files(version_dir, to_hash)
+        for relative_path in to_hash:
+            if hashes[relative_path] is None:
+                problems.append((relative_path, "unreadable"))
+            elif hashes[relative_path] != manifest["files"][relative_path]["hash"]:
+                problems.append((relative_path, "modified"))
+            else:
+                # Touched but identical, remember the new mtime so it isn't rehashed next time
+                manifest["files"][relative_path]["mtime_ns"] = current[relative_path][1]
+        save_integrity_manifests(manifests)
+
+    return sorted(problems)
+
+def print_integrity_problems(version_dir, problems):
+    print(Fore.RED + f"[!] {len(problems)} file(s) in {os.path.basename(version_dir)} do not match the integrity manifest:")
+    for relative_path, problem in problems[:10]:
+        print(Fore.YELLOW + f"  ✗ {relative_path} ({problem})")
+    if len(problems) > 10:
+        print(Fore.YELLOW + f"  ... and {len(problems) - 10} more")
+
+def confirm_install_integrity(version_dir):
+    """Pre-launch check. Returns False if the user chose not to launch"""
+    problems = check_install_integrity(version_dir)
+    if not problems:
+        return True
+
+    print_integrity_problems(version_dir, problems)
+    print(Fore.YELLOW + "The install may be partly updated or corrupted. Reinstalling ECS:R usually fixes this.")
+    choice = input(Fore.WHITE + "Launch anyway? (y = yes, r = yes and accept current files, N = cancel): ").strip().lower()
+    if choice == "r":
+        build_integrity_manifest(version_dir)
+        return True
+    return choice == "y"
+
+def verify_installs():
+    """Fully rehashes every detected version folder against its manifest"""
+    clear()
+    print(Fore.MAGENTA + "Install integrity check")
+    version_dirs = get_version_dirs()
+    if not version_dirs:
+        print(Fore.RED + "[!] No ECSRClient* version folders found.")
+
+    for version_dir in version_dirs:
+        print(Fore.CYAN + f"[*] Verifying {version_dir}...")
+        problems = check_install_integrity(version_dir, full=True)
+        if problems is None:
+            print(Fore.YELLOW + "  - No manifest yet, created one from the current files")
+        elif problems:
+            print_integrity_problems(version_dir, problems)
+        else:
+            print(Fore.GREEN + "  ✓ All files match")
+
+    print(Fore.MAGENTA + "=" * 50)
+    press_any_key()
+
 def debug():
     clear()
     sys_info = get_system_info()
@@ -409,22 +1197,112 @@ def debug():
     print(Fore.MAGENTA + "=" * 50)
     press_any_key()
 
-def save_state(state):
+# In-process copy of launcher_state.json. Only keys in "dirty" are written back,
+# merged into whatever is on disk at flush time, so other processes' keys survive.
+# A file written by a newer version is never written back, so its data isn't downgraded.
+_state_cache = {"namespaces": None, "stamp": None, "dirty": {}, "read_only": False}
+
+@contextmanager
+def _locked_state_file(exclusive):
+    """Holds a lock on a sidecar file, since launcher_state.json itself is replaced on write"""
+    with open(LAUNCHER_STATE_LOCK_FILE, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _state_file_stamp():
     try:
-        with open(LAUNCHER_STATE_FILE, "w") as f:
-            json.dump(state, f)
-    except Exception as e:
-        print(Fore.RED + f"[!] Failed to save launcher state: {e}")
+        stat = os.stat(LAUNCHER_STATE_FILE)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
 
-def load_state():
+def _read_state_file():
+    """Returns the namespaces stored on disk, migrating older layouts"""
     if not os.path.exists(LAUNCHER_STATE_FILE):
         return {}
     try:
         with open(LAUNCHER_STATE_FILE, "r") as f:
-            return json.load(f)
+            data = json.load(f)
     except json.JSONDecodeError:
         print(Fore.RED + "[!] Error reading launcher_state.json - invalid JSON format.")
         return {}
+    except OSError as e:
+        print(Fore.RED + f"[!] Error reading launcher_state.json: {e}")
+        return {}
+
+    if not isinstance(data, dict):
+        return {}
+    if "schema" not in data:
+        return {"launcher": data}
+    schema = data["schema"]
+    newer_schema = not isinstance(schema, int) or schema > STATE_SCHEMA_VERSION
+    if newer_schema and not _state_cache["read_only"]:
+        print(Fore.YELLOW + f"[!] launcher_state.json uses a newer schema ({schema}), it will not be modified.")
+    _state_cache["read_only"] = newer_schema
+    namespaces = data.get("namespaces", {})
+    return namespaces if isinstance(namespaces, dict) else {}
+
+def _apply_dirty_state(namespaces):
+    for (namespace, key), value in _state_cache["dirty"].items():
+        namespaces.setdefault(namespace, {})[key] = value
+    return namespaces
+
+def _state_namespaces():
+    """Cached namespaces, re-read only when another process changed the file"""
+    stamp = _state_file_stamp()
+    if _state_cache["namespaces"] is None or stamp != _state_cache["stamp"]:
+        try:
+            with _locked_state_file(exclusive=False):
+                stamp = _state_file_stamp()
+                namespaces = _read_state_file()
+        except OSError:
+            # The lock file can't be created (e.g. read-only script folder), read without it
+            stamp = _state_file_stamp()
+            namespaces = _read_state_file()
+        _state_cache["namespaces"] = _apply_dirty_state(namespaces)
+        _state_cache["stamp"] = stamp
+    return _state_cache["namespaces"]
+
+def state_get(namespace, key, default=None):
+    return _state_namespaces().get(namespace, {}).get(key, default)
+
+def state_set(namespace, key, value):
+    _state_namespaces().setdefault(namespace, {})[key] = value
+    _state_cache["dirty"][(namespace, key)] = value
+
+def flush_state():
+    """Merges dirty keys into launcher_state.json under an exclusive lock"""
+    if not _state_cache["dirty"]:
+        return True
+    tmp_path = LAUNCHER_STATE_FILE + ".tmp"
+    try:
+        with _locked_state_file(exclusive=True):
+            namespaces = _apply_dirty_state(_read_state_file())
+            if _state_cache["read_only"]:
+                return False
+            with open(tmp_path, "w") as f:
+                json.dump({"schema": STATE_SCHEMA_VERSION, "namespaces": namespaces}, f)
+            os.replace(tmp_path, LAUNCHER_STATE_FILE)
+            _state_cache["stamp"] = _state_file_stamp()
+    except Exception as e:
+        print(Fore.RED + f"[!] Failed to save launcher state: {e}")
+        return False
+    _state_cache["namespaces"] = namespaces
+    _state_cache["dirty"] = {}
+    return True
+
+atexit.register(flush_state)
 
 def register_uri_handler():
     """
@@ -507,13 +1385,15 @@ MimeType=x-scheme-handler/ecsr-player;
             try:
                 subprocess.run(["xdg-mime", "default", "ecsr-player.desktop", "x-scheme-handler/ecsr-player"], check=True)
                 print(Fore.GREEN + "[*] Successfully registered URI handler using xdg-mime!")
-                save_state({"uri_registered": True})
+                state_set("launcher", "uri_registered", True)
+                flush_state()
             except FileNotFoundError:
                 print(Fore.YELLOW + "[!] xdg-mime not found. Falling back to update-desktop-database...")
                 try:
                     subprocess.run(["update-desktop-database"], check=True)
                     print(Fore.GREEN + "[*] Successfully registered URI handler.")
-                    save_state({"uri_registered": True})
+                    state_set("launcher", "uri_registered", True)
+                    flush_state()
                 except subprocess.CalledProcessError as e:
                     print(Fore.RED + f"[!] Failed to register with update-desktop-database: {e}")
                     print(Fore.YELLOW + "This is often due to system permissions. You may need to run the command manually.")
@@ -559,59 +1439,34 @@ def check_fastflags_file():
 
 
 def main_menu():
-    while True:
-        clear()
-        sys_info = get_system_info()
-
-        gradient = [
-            (7, 200, 249),
-            (5, 157, 230),
-            (4, 123, 220),
-            (3, 98, 210),
-            (2, 74, 200),
-            (1, 58, 195),
-            (0, 50, 185),
-            (13, 65, 225),
-        ]
-
-        ascii_logo = [
-            "  ______ _____  _____  _____     _____ _                   ",
-            " |  ____/ ____|/ ____||  __ \   / ____| |                  ",
-            " | |__ | |    | (___(_) |__) | | (___ | |_ _ __ __ _ _ __  ",
-            " |  __|| |     \___ \ |  _  /   \___ \| __| '__/ _` | '_ \ ",
-            " | |___| |____ ____) || | \ \   ____) | |_| | | (_| | |_) |",
-            " |______\_____|_____(_)_|  \_\ |_____/ \__|_|  \__,_| .__/ ",
-            "                                                    | |    ",
-            "                                                    |_|    "
-        ]
-
-        for (r, g, b), line in zip(gradient, ascii_logo):
-            print(f"\033[38;2;{r};{g};{b}m{line}\033[0m")
+    sys_info = get_system_info()
+    platform_name = "Windows" if sys_info['is_windows'] else ("Linux" if sys_info['is_linux'] else ("macOS" if sys_info['is_macos'] else "Unknown"))
 
-        print(Fore.BLUE + "Made with <3 by 1w4md on ECS:R and usertest on Pekora")
+    while True:
+        lines = list(LOGO_BLOCK)
+        lines.append(Fore.BLUE + "Made with <3 by 1w4md on ECS:R and usertest on Pekora")
         
         # platform info
-        platform_name = "Windows" if sys_info['is_windows'] else ("Linux" if sys_info['is_linux'] else ("macOS" if sys_info['is_macos'] else "Unknown"))
-        print(Fore.CYAN + f"Running on: {platform_name}")
+        lines.append(Fore.CYAN + f"Running on: {platform_name}")
         if not sys_info['is_windows']:
-            print(Fore.YELLOW + "Note: Wine is required for Windows executables")
+            lines.append(Fore.YELLOW + "Note: Wine is required for Windows executables")
         
-        print()
-        print(Fore.YELLOW + "Select your option:")
+        lines.append("")
+        lines.append(Fore.YELLOW + "Select your option:")
         
         # Platform-specific menu logic
         if sys_info['is_linux']:
-            state = load_state()
-            uri_registered = state.get("uri_registered", False)
+            uri_registered = state_get("launcher", "uri_registered", False)
             
-            print(Fore.GREEN + "1 - Wait for ECS:R Launch")
+            lines.append(Fore.GREEN + "1 - Wait for ECS:R Launch")
             if not uri_registered:
-                print(Fore.GREEN + "2 - Register URI Handler")
-                print(Fore.GREEN + "3 - Set FastFlags")
+                lines.append(Fore.GREEN + "2 - Register URI Handler")
+                lines.append(Fore.GREEN + "3 - Set FastFlags")
             else:
-                print(Fore.GREEN + "2 - Set FastFlags")
-            print(Fore.RED + "0 - Exit")
+                lines.append(Fore.GREEN + "2 - Set FastFlags")
+            lines.append(Fore.RED + "0 - Exit")
             
+            render_screen(lines)
             choice = input(Fore.WHITE + "\nEnter your choice: ")
             
             if choice == "1":
@@ -632,14 +1487,19 @@ def main_menu():
                 sys.exit()
             elif choice.lower() == "chkff":
                 check_fastflags_file()
+            elif choice.lower() == "chkperf":
+                perf_report()
+            elif choice.lower() == "chkint":
+                verify_installs()
             else:
                 print(Fore.RED + "Invalid choice! Try again.")
                 press_any_key()
                 
         elif sys_info['is_windows']:
-            print(Fore.GREEN + "1 - Set FastFlags")
-            print(Fore.RED + "0 - Exit")
+            lines.append(Fore.GREEN + "1 - Set FastFlags")
+            lines.append(Fore.RED + "0 - Exit")
             
+            render_screen(lines)
             choice = input(Fore.WHITE + "\nEnter your choice: ")
             
             if choice == "1":
@@ -649,14 +1509,19 @@ def main_menu():
                 sys.exit()
             elif choice.lower() == "chkff":
                 check_fastflags_file()
+            elif choice.lower() == "chkperf":
+                perf_report()
+            elif choice.lower() == "chkint":
+                verify_installs()
             else:
                 print(Fore.RED + "Invalid choice! Try again.")
                 press_any_key()
         else:
             # Fallback for other systems
-            print(Fore.GREEN + "1 - Set FastFlags")
-            print(Fore.RED + "0 - Exit")
+            lines.append(Fore.GREEN + "1 - Set FastFlags")
+            lines.append(Fore.RED + "0 - Exit")
 
+            render_screen(lines)
             choice = input(Fore.WHITE + "\nEnter your choice: ")
             if choice == "1":
                 ask_fastflags()
@@ -665,6 +1530,10 @@ def main_menu():
                 sys.exit()
             elif choice.lower() == "chkff":
                 check_fastflags_file()
+            elif choice.lower() == "chkperf":
+                perf_report()
+            elif choice.lower() == "chkint":
+                verify_installs()
             else:
                 print(Fore.RED + "Invalid choice! Try again.")
                 press_any_key()
@@ -706,7 +1575,11 @@ def launch_version(uri, folder):
     # Step 1: Terminate any existing processes
     kill_existing_process("RobloxPlayerLauncher.exe")
     
-    # Step 2: Apply FastFlags
+    # Step 2: Pull the fleet bundle (falls back to the cached one) and apply FastFlags
+    fleet_config = load_fleet_config()
+    if fleet_config.get("url"):
+        sync_fastflags(fleet_config)
+
     fastflags = load_fastflags()
     
     # This is the corrected line. It will now always print the correct number of flags.
@@ -728,9 +1601,17 @@ def launch_version(uri, folder):
             exe_path = full_path
             break
     
+    # Catch partly updated or corrupted installs before paying for a full client startup
+    if exe_path and not confirm_install_integrity(os.path.dirname(exe_path)):
+        print(Fore.YELLOW + "[*] Launch cancelled.")
+        press_any_key()
+        return
+
     if exe_path:
         try:
             launch_args = [exe_path, uri] # Pass the URI as a command-line argument
+            # Logs from the previous run are complete now that its process is gone
+            record_launch(fastflags)
             if sys_info['is_windows']:
                 subprocess.Popen(launch_args)
             elif sys_info['is_linux']:
@@ -768,6 +1649,17 @@ if __name__ == "__main__":
         # The script was launched by xdg-open to handle a URI
         uri = sys.argv[1]
         launch_version(uri, "ECS:R")
+    elif len(sys.argv) > 1 and sys.argv[1] == "--sync-flags":
+        # Unattended fleet sync, e.g. from cron
+        if sync_fastflags():
+            apply_fastflags(load_fastflags())
+    elif len(sys.argv) > 1 and sys.argv[1] == "--make-bundle":
+        # Fleet admins: python EcsrStrap.py --make-bundle fastFlags.json > bundle.json
+        print_flag_bundle(sys.argv[2] if len(sys.argv) > 2 else FASTFLAGS_FILE)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--perf-report":
+        perf_report()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--verify-install":
+        verify_installs()
     else:
         # The script was launched directly, show the main menu
         main_menu()